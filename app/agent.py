@@ -1,41 +1,150 @@
+import functools
 import logging
+from collections.abc import Collection
 
+import httpx
 from groq import APIError as GroqAPIError
 from langchain.agents import create_agent
-from langchain.agents.middleware import ModelRetryMiddleware
+from langchain.agents.middleware import AgentMiddleware, ModelRetryMiddleware
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_groq import ChatGroq
+from langgraph.config import get_stream_writer
+from pydantic import PrivateAttr
 
+from app.batch_tool import create_batch_tool
 from app.browser import BrowserManager
 from app.config import Settings
+from app.tool_selection import ToolIndex, ToolSelectionMiddleware
 from app.tools import crawl, page_info, scrape, scrape_json, scrape_table
 
 logger = logging.getLogger(__name__)
 
-_SYSTEM_PROMPT_BASE = """\
+_SYSTEM_PROMPT_HEADER = """\
 You are a fast web scraping assistant.
 
 Rules:
-- Use page_info(url) first to understand a page before scraping.
-- Use scrape(url, selector) for most extraction. Pick a precise CSS selector.
-- Use scrape_table(url) for tabular data.
-- Use scrape_json(url) to extract structured product/article data (JSON-LD, microdata).
-- Use crawl(url, max_pages) to follow links and scrape multiple pages.
-- Give a concise final answer. Do not repeat raw scraped data verbatim."""
+"""
 
-_BROWSER_ADDENDUM = """
-- Only use browser tools (navigate_browser, etc.) when scrape() returns empty content (JS-rendered SPA).
-- If a browser tool reports a context error, just navigate again."""
+# (tool the rule is about, or None for always, rule). Only rules whose tool is
+# sent to the model end up in the prompt — see ToolSelectionMiddleware.
+_RULES: tuple[tuple[str | None, str], ...] = (
+    ("page_info", "Use page_info(url) first to understand a page before scraping."),
+    ("scrape", "Use scrape(url, selector) for most extraction. Pick a precise CSS selector."),
+    ("scrape_table", "Use scrape_table(url) for tabular data."),
+    ("scrape_json", "Use scrape_json(url) to extract structured product/article data (JSON-LD, microdata)."),
+    ("crawl", "Use crawl(url, max_pages) to follow links and scrape multiple pages."),
+    (
+        "batch",
+        "To run the same tool on several URLs/selectors, call batch once instead of issuing N separate calls "
+        "(works with scrape, scrape_table, page_info, scrape_json, crawl).",
+    ),
+    (None, "Give a concise final answer. Do not repeat raw scraped data verbatim."),
+    (
+        "navigate_browser",
+        "Only use browser tools (navigate_browser, etc.) when scrape() returns empty content (JS-rendered SPA).",
+    ),
+    ("extract_page", "After navigating, prefer extract_page over separate extract_text + extract_hyperlinks calls."),
+    ("navigate_browser", "If a browser tool reports a context error, just navigate again."),
+)
 
+_PARALLEL_RULE = (
+    "When independent calls use different tools (e.g. page_info on one URL and scrape on another), "
+    "issue them together in one turn — they run concurrently."
+)
 
-def build_agent(settings: Settings, browser_manager: BrowserManager):
-    llm = ChatGroq(
+
+def _system_prompt(tool_names: Collection[str], parallel: bool) -> str:
+    """System prompt with the rules for `tool_names` only."""
+    rules = [rule for tool, rule in _RULES if tool is None or tool in tool_names]
+    if parallel:
+        rules.append(_PARALLEL_RULE)
+    return _SYSTEM_PROMPT_HEADER + "\n".join(f"- {rule}" for rule in rules)
+
+
+class ParallelToolCallsMiddleware(AgentMiddleware):
+    """Pin Groq's `parallel_tool_calls` flag on every model request.
+
+    `create_agent` already fans each pending tool call out to its own task,
+    so the tools of a single turn run concurrently. This only controls
+    whether the model may emit more than one call per turn.
+    """
+
+    def __init__(self, enabled: bool):
+        super().__init__()
+        self.enabled = enabled
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._override(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._override(request))
+
+    def _override(self, request):
+        if not request.tools:
+            return request
+        model_settings = {**request.model_settings, "parallel_tool_calls": self.enabled}
+        return request.override(model_settings=model_settings)
+
+
+# Shared keep-alive pool for api.groq.com so the TLS handshake is amortised
+# across every LLM call of every request. Closed in the app lifespan.
+llm_http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(60.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60.0),
+)
+
+
+class ToolEventsMiddleware(AgentMiddleware):
+    """Emit ("tool_start"|"tool_end", tool_name) on the graph's custom stream.
+
+    Lets the route stream with `stream_mode=["messages", "custom"]` instead of
+    filtering every internal runnable event out of `astream_events`.
+    """
+
+    async def awrap_tool_call(self, request, handler):
+        write = get_stream_writer()
+        name = request.tool_call["name"]
+        write(("tool_start", name))
+        try:
+            return await handler(request)
+        finally:
+            write(("tool_end", name))
+
+
+class FrozenSchemaChatGroq(ChatGroq):
+    """ChatGroq that serializes each tool's JSON schema once, not on every model call.
+
+    `create_agent` calls `bind_tools` before each LLM step; the tool set is
+    fixed after startup, so the converted schemas are cached by tool name.
+    """
+
+    _tool_schemas: dict[str, dict] = PrivateAttr(default_factory=dict)
+
+    def bind_tools(self, tools, **kwargs):
+        return super().bind_tools([self._tool_schema(t) for t in tools], **kwargs)
+
+    def _tool_schema(self, tool):
+        if not isinstance(tool, BaseTool):
+            return tool
+        schema = self._tool_schemas.get(tool.name)
+        if schema is None:
+            schema = self._tool_schemas[tool.name] = convert_to_openai_tool(tool)
+        return schema
+
+
+def build_llm(settings: Settings) -> ChatGroq:
+    return FrozenSchemaChatGroq(
         api_key=settings.groq_api_key,
         model=settings.groq_model,
         temperature=settings.groq_temperature,
         max_retries=1,
         max_tokens=settings.groq_max_tokens,
+        http_async_client=llm_http_client,
     )
 
+
+def build_agent(settings: Settings, browser_manager: BrowserManager, llm: ChatGroq):
     retry_middleware = ModelRetryMiddleware(
         max_retries=settings.agent_max_retries,
         retry_on=(GroqAPIError,),
@@ -46,11 +155,10 @@ def build_agent(settings: Settings, browser_manager: BrowserManager):
 
     browser_tools = browser_manager.get_browser_tools()
     custom_tools = [scrape, scrape_table, page_info, scrape_json, crawl]
-    all_tools = custom_tools + browser_tools
+    http_tools = custom_tools + [create_batch_tool(custom_tools)]
+    all_tools = http_tools + browser_tools
 
-    system_prompt = _SYSTEM_PROMPT_BASE
-    if browser_tools:
-        system_prompt += _BROWSER_ADDENDUM
+    render_prompt = functools.partial(_system_prompt, parallel=settings.agent_parallel_tool_execution)
 
     logger.info(
         "Building agent with %d tools: %s",
@@ -58,10 +166,27 @@ def build_agent(settings: Settings, browser_manager: BrowserManager):
         ", ".join(t.name for t in all_tools),
     )
 
+    middleware = [
+        retry_middleware,
+        ParallelToolCallsMiddleware(settings.agent_parallel_tool_execution),
+        ToolEventsMiddleware(),
+    ]
+    if settings.agent_tool_top_k > 0:
+        # Only the HTTP tools compete for the top-k slots. The browser tools are
+        # the fallback for JS-rendered pages and must stay reachable all run.
+        middleware.append(
+            ToolSelectionMiddleware(
+                ToolIndex(http_tools),
+                top_k=settings.agent_tool_top_k,
+                always_include=("page_info", "scrape", "batch", *(t.name for t in browser_tools)),
+                render_prompt=render_prompt,
+            )
+        )
+
     agent = create_agent(
         model=llm,
         tools=all_tools,
-        system_prompt=system_prompt,
-        middleware=[retry_middleware],
+        system_prompt=render_prompt(frozenset(t.name for t in all_tools)),
+        middleware=middleware,
     )
     return agent
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import logging
+from typing import Any, TypedDict
+
+from langchain_core.tools import BaseTool, tool
+from pydantic import ValidationError
+
+from app.tools import _truncate
+
+logger = logging.getLogger(__name__)
+
+_MAX_INVOCATIONS = 10
+_MAX_OUTPUT_CHARS = 40_000  # Shared evenly by the invocations of one batch
+
+
+class ToolInvocation(TypedDict):
+    tool_name: str
+    arguments: dict[str, Any]
+
+
+def create_batch_tool(tools: list[BaseTool]) -> BaseTool:
+    """Build a `batch` meta-tool that fans invocations out over `tools`.
+
+    Only pass stateless tools here — browser tools share a single page and
+    must not run concurrently.
+    """
+    by_name = {t.name: t for t in tools}
+    available = ", ".join(by_name)
+
+    async def _run(invocation: ToolInvocation) -> str:
+        name = invocation.get("tool_name", "")
+        target = by_name.get(name)
+        if target is None:
+            return f"Unknown tool '{name}'. Batchable tools: {available}."
+        try:
+            return await target.ainvoke(invocation.get("arguments") or {})
+        except ValidationError as exc:
+            return f"Invalid arguments for {name}: {exc}"
+        except Exception as exc:
+            return f"Error running {name}: {exc}"
+
+    @tool
+    async def batch(invocations: list[ToolInvocation]) -> str:
+        """Run several independent tool calls concurrently in one step.
+
+        Returns a JSON list of {"tool_name", "result"} in the same order.
+
+        Args:
+            invocations: Up to 10 objects like {"tool_name": "scrape", "arguments": {"url": "..."}}.
+        """
+        if not invocations:
+            return "No invocations given."
+        if len(invocations) > _MAX_INVOCATIONS:
+            return f"Too many invocations ({len(invocations)}). Send at most {_MAX_INVOCATIONS} per batch."
+
+        results = await asyncio.gather(*(_run(inv) for inv in invocations))
+        # Truncate each result rather than the serialized list, so it stays valid JSON.
+        budget = _MAX_OUTPUT_CHARS // len(invocations)
+        return json.dumps(
+            [
+                {"tool_name": inv.get("tool_name", ""), "result": _truncate(result, limit=budget)}
+                for inv, result in zip(invocations, results)
+            ],
+            ensure_ascii=False,
+        )
+
+    return batch
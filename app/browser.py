@@ -1,16 +1,30 @@
+import asyncio
+import importlib.util
 import logging
 import random
+from typing import TYPE_CHECKING
 
 from app.tools import _USER_AGENTS
 
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
 logger = logging.getLogger(__name__)
 
-try:
-    from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    Browser = BrowserContext = Page = Playwright = async_playwright = None
+# Playwright itself is only imported in BrowserManager.start, so a process with
+# BROWSER_ENABLED=false never pays for it.
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+
+# Bytes the scraping tools never read. Stylesheets stay: click_element relies
+# on `visible=true`, which depends on CSS.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+async def _block_heavy_resources(route) -> None:
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 class BrowserManager:
@@ -19,19 +33,30 @@ class BrowserManager:
         headless: bool = True,
         nav_timeout: int = 60000,
         action_timeout: int = 10000,
+        block_resources: bool = True,
     ):
         self._headless = headless
+        self._block_resources = block_resources
         self._nav_timeout = nav_timeout
         self._action_timeout = action_timeout
         self._playwright: "Playwright | None" = None
         self._browser: "Browser | None" = None
         self._context: "BrowserContext | None" = None
         self._page: "Page | None" = None
+        # A pre-warmed (context, blank page) pair so resets don't wait on Chromium.
+        self._warm: "asyncio.Task[tuple[BrowserContext, Page]] | None" = None
+        # Every browser tool drives the one shared page, so they take turns.
+        self._page_lock = asyncio.Lock()
+        # Guards swapping self._context/_page/_warm so overlapping resets can't
+        # leak a context or orphan the warm spare.
+        self._context_lock = asyncio.Lock()
 
     async def start(self) -> None:
         if not PLAYWRIGHT_AVAILABLE:
             logger.warning("Playwright is not installed — browser tools disabled")
             return
+        from playwright.async_api import async_playwright
+
         try:
             self._playwright = await async_playwright().start()
             self._browser = await self._playwright.chromium.launch(headless=self._headless)
@@ -43,6 +68,14 @@ class BrowserManager:
             self._browser = None
 
     async def stop(self) -> None:
+        if self._warm:
+            self._warm.cancel()
+            try:
+                context, _ = await self._warm
+                await context.close()
+            except BaseException:
+                pass
+            self._warm = None
         if self._context:
             try:
                 await self._context.close()
@@ -66,12 +99,28 @@ class BrowserManager:
     def action_timeout(self) -> int:
         return self._action_timeout
 
+    @property
+    def page_lock(self) -> asyncio.Lock:
+        """Held by each browser tool for its whole call."""
+        return self._page_lock
+
     async def get_page(self) -> "Page":
         if self._page and not self._page.is_closed():
             return self._page
-        await self._reset_context()
-        assert self._page is not None
-        return self._page
+        async with self._context_lock:
+            # Another caller may have reopened it while we waited.
+            if self._page and not self._page.is_closed():
+                return self._page
+            if self._context:
+                # Only the page died — reopen it in the existing context.
+                try:
+                    self._page = await self._context.new_page()
+                    return self._page
+                except Exception:
+                    logger.debug("Browser context unusable, replacing it", exc_info=True)
+            await self._replace_context()
+            assert self._page is not None
+            return self._page
 
     async def reset_page(self) -> "Page":
         logger.warning("Force-resetting browser context and page")
@@ -80,15 +129,40 @@ class BrowserManager:
         return self._page
 
     async def _reset_context(self) -> None:
-        if self._context:
+        async with self._context_lock:
+            await self._replace_context()
+
+    async def _replace_context(self) -> None:
+        """Swap in a fresh context. The caller holds _context_lock."""
+        if self._browser is None:
+            raise RuntimeError("Browser not started")
+        old_context = self._context
+        self._context, self._page = await self._take_warm_context()
+        self._warm = asyncio.create_task(self._new_context())
+        if old_context:
             try:
-                await self._context.close()
+                await old_context.close()
             except Exception:
                 pass
-        if self._browser is None:
-            raise RuntimeError("Browser not started")
-        self._context = await self._browser.new_context(user_agent=random.choice(_USER_AGENTS))
-        self._page = await self._context.new_page()
+
+    async def _new_context(self) -> "tuple[BrowserContext, Page]":
+        context = await self._browser.new_context(user_agent=random.choice(_USER_AGENTS))
+        if self._block_resources:
+            await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
+        return context, page
+
+    async def _take_warm_context(self) -> "tuple[BrowserContext, Page]":
+        warm, self._warm = self._warm, None
+        if warm is not None:
+            try:
+                context, page = await warm
+                if not page.is_closed():
+                    return context, page
+                await context.close()
+            except Exception:
+                logger.debug("Warm browser context failed, creating a fresh one", exc_info=True)
+        return await self._new_context()
 
     def get_browser_tools(self) -> list:
         if not self.is_alive:
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import logging
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from langchain_core.tools import tool
 from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser
 
 if TYPE_CHECKING:
     from app.browser import BrowserManager
@@ -16,14 +18,84 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 _MAX_CHARS = 20_000
+# Output is capped at _MAX_CHARS, so anything past this point is never shown.
+_MAX_HTML_CHARS = 1_000_000
 
 _CONTEXT_DESTROYED = "Execution context was destroyed"
 
+# Reads every requested attribute of every match in one CDP round-trip.
+_GET_ELEMENTS_JS = """(els, attrs) => els.map(e => Object.fromEntries(
+    attrs.map(a => [a, a === "innerText" ? e.innerText : e.getAttribute(a)])
+))"""
+
+
+_PAGE_FIELDS = ("title", "meta", "text", "links")
+
+
+def _stripped_text(node) -> str:
+    """Non-blank text fragments, stripped and joined by single spaces.
+
+    Plain `text(separator=" ", strip=True)` still emits a separator for every
+    whitespace-only node (indentation), padding the output with runs of spaces.
+    The parser never leaves NUL in text nodes, so it is safe as a temporary separator.
+    """
+    return " ".join(filter(None, node.text(separator="\0", strip=True, skip_empty=True).split("\0")))
+
+
+def _visible_text(tree: LexborHTMLParser) -> str:
+    return _stripped_text(tree.root) if tree.root else ""
+
+
+def _collect_links(
+    tree: LexborHTMLParser, base_url: str, absolute_urls: bool, limit: int
+) -> list[dict[str, str]]:
+    """Collect {text, href} for anchors, stopping once the JSON would pass `limit` chars."""
+    links = []
+    size = 0
+    for a in tree.css("a[href]"):
+        href = a.attributes.get("href") or ""
+        if absolute_urls:
+            href = urljoin(base_url, href)
+        text = _stripped_text(a)
+        links.append({"text": text, "href": href})
+        size += len(text) + len(href) + 28  # JSON keys and punctuation
+        if size > limit:
+            break
+    return links
+
 
 def create_browser_tools(manager: BrowserManager) -> list:
+    # Parsed tree of the live page, keyed by URL and validated by a content hash,
+    # so the extract_* tools on the same page parse it once.
+    tree_cache: dict[str, tuple[str, LexborHTMLParser]] = {}
+
+    async def _page_tree(page) -> LexborHTMLParser:
+        html = (await page.content())[:_MAX_HTML_CHARS]
+        digest = hashlib.blake2b(html.encode(), digest_size=8).hexdigest()
+        cached = tree_cache.get(page.url)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style", "template"])
+        tree_cache.clear()
+        tree_cache[page.url] = (digest, tree)
+        return tree
+
+    def _exclusive(func):
+        """Run a tool under the manager's page lock; parallel tool calls share one page."""
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with manager.page_lock:
+                return await func(*args, **kwargs)
+
+        return wrapper
+
     @tool
+    @_exclusive
     async def navigate_browser(url: str) -> str:
         """Navigate browser to a URL. Use for JS-heavy pages."""
+        tree_cache.clear()
         try:
             page = await manager.get_page()
             resp = await page.goto(
@@ -44,8 +116,10 @@ def create_browser_tools(manager: BrowserManager) -> list:
             return f"Unexpected error navigating to {url}: {exc}"
 
     @tool
+    @_exclusive
     async def click_element(selector: str) -> str:
         """Click a visible element matching a CSS selector."""
+        tree_cache.clear()
         try:
             page = await manager.get_page()
             await page.click(
@@ -64,22 +138,14 @@ def create_browser_tools(manager: BrowserManager) -> list:
             return f"Unexpected error clicking '{selector}': {exc}"
 
     @tool
+    @_exclusive
     async def get_elements(
         selector: str, attributes: list[str] = ["innerText"]
     ) -> str:
         """Get elements matching a CSS selector. Returns JSON list of attributes."""
         try:
             page = await manager.get_page()
-            elements = await page.query_selector_all(selector)
-            results = []
-            for el in elements:
-                item: dict[str, str | None] = {}
-                for attr in attributes:
-                    if attr == "innerText":
-                        item[attr] = await el.inner_text()
-                    else:
-                        item[attr] = await el.get_attribute(attr)
-                results.append(item)
+            results = await page.eval_on_selector_all(selector, _GET_ELEMENTS_JS, attributes)
             output = json.dumps(results, ensure_ascii=False)
             if len(output) > _MAX_CHARS:
                 output = output[:_MAX_CHARS] + "\n\n[Truncated]"
@@ -95,13 +161,13 @@ def create_browser_tools(manager: BrowserManager) -> list:
             return f"Unexpected error querying '{selector}': {exc}"
 
     @tool
+    @_exclusive
     async def extract_text() -> str:
         """Extract all visible text from the current page."""
         try:
             page = await manager.get_page()
-            html = await page.content()
-            soup = BeautifulSoup(html, "lxml")
-            text = " ".join(soup.stripped_strings)
+            tree = await _page_tree(page)
+            text = _visible_text(tree)
             if len(text) > _MAX_CHARS:
                 text = text[:_MAX_CHARS] + "\n\n[Truncated]"
             return text
@@ -114,20 +180,14 @@ def create_browser_tools(manager: BrowserManager) -> list:
             return f"Unexpected error extracting text: {exc}"
 
     @tool
+    @_exclusive
     async def extract_hyperlinks(absolute_urls: bool = False) -> str:
         """Extract all hyperlinks from the current page as JSON."""
         try:
             page = await manager.get_page()
-            html = await page.content()
             base_url = page.url
-            soup = BeautifulSoup(html, "lxml")
-            links = []
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                if absolute_urls:
-                    href = urljoin(base_url, href)
-                text = a.get_text(separator=" ", strip=True)
-                links.append({"text": text, "href": href})
+            tree = await _page_tree(page)
+            links = _collect_links(tree, base_url, absolute_urls, _MAX_CHARS)
             output = json.dumps(links, ensure_ascii=False)
             if len(output) > _MAX_CHARS:
                 output = output[:_MAX_CHARS] + "\n\n[Truncated]"
@@ -141,6 +201,54 @@ def create_browser_tools(manager: BrowserManager) -> list:
             return f"Unexpected error extracting hyperlinks: {exc}"
 
     @tool
+    @_exclusive
+    async def extract_page(
+        fields: list[str] = list(_PAGE_FIELDS), absolute_urls: bool = True
+    ) -> str:
+        """Extract title, meta tags, visible text and/or links from the current page in one call.
+
+        Args:
+            fields: Any of "title", "meta", "text", "links" (default: all).
+            absolute_urls: Resolve link hrefs against the page URL.
+        """
+        wanted = [f for f in _PAGE_FIELDS if f in fields]
+        if not wanted:
+            return f"No known fields in {fields}. Use any of: {', '.join(_PAGE_FIELDS)}."
+        try:
+            page = await manager.get_page()
+            base_url = page.url
+            tree = await _page_tree(page)
+            # Split the output budget between the two unbounded fields.
+            budget = _MAX_CHARS // max(1, sum(f in ("text", "links") for f in wanted))
+            result: dict = {}
+            if "title" in wanted:
+                title = tree.css_first("title")
+                result["title"] = title.text(strip=True) if title else None
+            if "meta" in wanted:
+                meta: dict[str, str] = {}
+                for tag in tree.css("meta[content]"):
+                    key = tag.attributes.get("name") or tag.attributes.get("property")
+                    if key:
+                        meta[key] = tag.attributes.get("content") or ""
+                result["meta"] = meta
+            if "text" in wanted:
+                result["text"] = _visible_text(tree)[:budget]
+            if "links" in wanted:
+                result["links"] = _collect_links(tree, base_url, absolute_urls, budget)
+            output = json.dumps(result, ensure_ascii=False)
+            if len(output) > _MAX_CHARS:
+                output = output[:_MAX_CHARS] + "\n\n[Truncated]"
+            return output
+        except PlaywrightError as exc:
+            if _CONTEXT_DESTROYED in str(exc):
+                await manager.reset_page()
+                return "Browser context was destroyed and has been reset. Please navigate to the URL again."
+            return f"Browser error extracting page: {exc}"
+        except Exception as exc:
+            return f"Unexpected error extracting page: {exc}"
+
+    @tool
+    @_exclusive
     async def current_webpage() -> str:
         """Return the current page URL."""
         try:
@@ -155,8 +263,10 @@ def create_browser_tools(manager: BrowserManager) -> list:
             return f"Unexpected error getting current URL: {exc}"
 
     @tool
+    @_exclusive
     async def previous_webpage() -> str:
         """Go back to the previous page."""
+        tree_cache.clear()
         try:
             page = await manager.get_page()
             resp = await page.go_back(
@@ -182,6 +292,7 @@ def create_browser_tools(manager: BrowserManager) -> list:
         get_elements,
         extract_text,
         extract_hyperlinks,
+        extract_page,
         current_webpage,
         previous_webpage,
     ]
@@ -1,3 +1,5 @@
+import hashlib
+
 from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
@@ -12,6 +14,8 @@ class Settings(BaseSettings):
     agent_recursion_limit: int = 15
     agent_request_timeout: int = 120
     agent_max_retries: int = 2
+    agent_parallel_tool_execution: bool = True
+    agent_tool_top_k: int = 3
 
     groq_max_tokens: int = 2048
 
@@ -19,6 +23,7 @@ class Settings(BaseSettings):
     browser_headless: bool = True
     browser_nav_timeout: int = 60000
     browser_action_timeout: int = 10000
+    browser_block_resources: bool = True
 
     cors_origins: str = "*"
 
@@ -30,11 +35,15 @@ class Settings(BaseSettings):
     @model_validator(mode="after")
     def _parse(self):
         self._api_keys_list = [k.strip() for k in self.api_keys.split(",") if k.strip()]
+        self._api_key_hashes = frozenset(hashlib.sha256(k.encode()).digest() for k in self._api_keys_list)
         self._cors_origins_list = [o.strip() for o in self.cors_origins.split(",") if o.strip()]
         return self
 
     def get_api_keys(self) -> list[str]:
         return self._api_keys_list
 
+    def get_api_key_hashes(self) -> frozenset[bytes]:
+        return self._api_key_hashes
+
     def get_cors_origins(self) -> list[str]:
         return self._cors_origins_list
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -5,7 +6,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.agent import build_agent
+from app.agent import build_agent, build_llm, llm_http_client
 from app.browser import BrowserManager
 from app.config import Settings
 from app.logging import setup_logging
@@ -16,25 +17,35 @@ from app.tools import cache_clear, http_client
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    settings: Settings = app.state.settings
-    setup_logging(settings.debug)
-    logger.info("Settings loaded")
-
+async def _start_browser(settings: Settings) -> BrowserManager:
     browser_manager = BrowserManager(
         headless=settings.browser_headless,
         nav_timeout=settings.browser_nav_timeout,
         action_timeout=settings.browser_action_timeout,
+        block_resources=settings.browser_block_resources,
     )
     if settings.browser_enabled:
         await browser_manager.start()
     else:
         logger.info("Browser disabled via BROWSER_ENABLED=false")
+    return browser_manager
+
 
-    agent = build_agent(settings, browser_manager)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings: Settings = app.state.settings
+    setup_logging(settings.debug)
+    logger.info("Settings loaded")
+
+    # Chromium launch and LLM client setup are independent; the agent needs both.
+    browser_manager, llm = await asyncio.gather(
+        _start_browser(settings),
+        asyncio.to_thread(build_llm, settings),
+    )
+    agent = build_agent(settings, browser_manager, llm)
 
     app.state.browser_manager = browser_manager
+    app.state.llm = llm
     app.state.agent = agent
 
     logger.info("Startup complete")
@@ -42,6 +53,7 @@ async def lifespan(app: FastAPI):
 
     cache_clear()
     await http_client.aclose()
+    await llm_http_client.aclose()
     await browser_manager.stop()
     logger.info("Shutdown complete")
 
@@ -51,6 +63,7 @@ def create_app() -> FastAPI:
 
     app = FastAPI(title="Agentic Flagship API", lifespan=lifespan)
     app.state.settings = settings
+    app.state.api_key_hashes = settings.get_api_key_hashes()
 
     app.add_middleware(
         CORSMiddleware,
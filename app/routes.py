@@ -1,10 +1,12 @@
 import asyncio
 import json
 import logging
+import time
 
 from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from groq import APIError as GroqAPIError, RateLimitError as GroqRateLimitError
+from langchain_core.messages import AIMessageChunk
 from langgraph.errors import GraphRecursionError
 
 from app.security import verify_api_key
@@ -14,10 +16,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+_TOKEN_FLUSH_INTERVAL = 0.01  # seconds of tokens coalesced into one SSE frame
+
+
 def _sse(event: str, data: str) -> str:
     return f"data: {json.dumps({'type': event, 'content': data})}\n\n"
 
 
+def _sse_token(content: str) -> str:
+    # Same wire format as _sse("token", ...) without building a dict per frame.
+    return f'data: {{"type": "token", "content": {json.dumps(content)}}}\n\n'
+
+
 @router.get("/run-mission")
 async def run_mission(
     request: Request,
@@ -31,22 +41,64 @@ async def run_mission(
     logger.info("Request: %s", truncated)
 
     async def event_generator():
-        try:
+        # The agent runs in its own task so a pending token flush can time out
+        # while waiting for the next item, without cancelling the stream itself.
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
             async with asyncio.timeout(timeout):
-                async for event in agent.astream_events(
+                async for item in agent.astream(
                     {"messages": [("user", prompt)]},
-                    version="v2",
+                    stream_mode=["messages", "custom"],
                     config={"recursion_limit": settings.agent_recursion_limit},
                 ):
-                    kind = event["event"]
-                    if kind == "on_chat_model_stream":
-                        content = event["data"]["chunk"].content
-                        if content:
-                            yield _sse("token", content)
-                    elif kind == "on_tool_start":
-                        yield _sse("tool_start", event["name"])
-                    elif kind == "on_tool_end":
-                        yield _sse("tool_end", event["name"])
+                    queue.put_nowait(item)
+
+        producer = asyncio.create_task(pump())
+        producer.add_done_callback(lambda _: queue.put_nowait(None))
+
+        tokens: list[str] = []
+        flush_at = 0.0
+        # Hot path: one iteration per streamed token, so bind lookups locally.
+        append = tokens.append
+        monotonic = time.monotonic
+        chunk_type = AIMessageChunk
+        try:
+            while True:
+                if tokens:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), flush_at - monotonic())
+                    except TimeoutError:
+                        yield _sse_token("".join(tokens))
+                        tokens.clear()
+                        continue
+                else:
+                    item = await queue.get()
+                if item is None:
+                    break
+
+                mode, chunk = item
+                if mode == "messages":
+                    message = chunk[0]
+                    if type(message) is chunk_type and message.content:
+                        now = monotonic()
+                        if not tokens:
+                            flush_at = now + _TOKEN_FLUSH_INTERVAL
+                        append(message.content)
+                        if now >= flush_at:
+                            yield _sse_token("".join(tokens))
+                            tokens.clear()
+                    continue
+                if tokens:
+                    yield _sse_token("".join(tokens))
+                    tokens.clear()
+                # (event, tool_name) from ToolEventsMiddleware
+                yield _sse(*chunk)
+
+            if tokens:
+                yield _sse_token("".join(tokens))
+            # Re-raises whatever ended the agent run early.
+            producer.result()
 
             yield _sse("done", "")
             logger.info("Completed: %s", truncated)
@@ -74,11 +126,20 @@ async def run_mission(
         except Exception:
             logger.exception("Stream error: %s", truncated)
             yield _sse("error", "An internal error occurred.")
+        finally:
+            producer.cancel()
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
+_HEALTH_CACHE_CONTROL = "max-age=5"
+
+
 @router.get("/health")
 async def health(request: Request):
     browser_ok = request.app.state.browser_manager.is_alive
-    return {"status": "healthy", "browser": browser_ok}
+    etag = '"healthy-browser"' if browser_ok else '"healthy-no-browser"'
+    headers = {"ETag": etag, "Cache-Control": _HEALTH_CACHE_CONTROL}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({"status": "healthy", "browser": browser_ok}, headers=headers)
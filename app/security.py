@@ -1,9 +1,11 @@
+import asyncio
+import hashlib
 import ipaddress
 import logging
-import secrets
+import math
 import socket
 import time
-from collections import deque
+from collections import OrderedDict
 from urllib.parse import urlparse
 
 from fastapi import HTTPException, Request, Response, Security
@@ -21,21 +23,23 @@ async def verify_api_key(
 ) -> str:
     if api_key is None:
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
-    for valid_key in request.app.state.settings.get_api_keys():
-        if secrets.compare_digest(api_key, valid_key):
-            return api_key
+    # Comparing SHA-256 digests means lookup timing reveals nothing about the keys.
+    digest = hashlib.sha256(api_key.encode()).digest()
+    if digest in request.app.state.api_key_hashes:
+        return api_key
     raise HTTPException(status_code=401, detail="Invalid or missing API key")
 
 
 # ---------------------------------------------------------------------------
-# Rate limiting middleware (in-memory sliding window)
+# Rate limiting middleware (in-memory token bucket)
 # ---------------------------------------------------------------------------
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, rpm: int):
         super().__init__(app)
         self.rpm = rpm
-        self._windows: dict[str, deque[float]] = {}
+        self._refill_rate = rpm / 60.0  # tokens per second
+        self._buckets: dict[str, tuple[float, float]] = {}
         self._request_count = 0
 
     async def dispatch(self, request: Request, call_next) -> Response:
@@ -43,14 +47,13 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         if api_key is None:
             return await call_next(request)
 
-        now = time.time()
-        window = self._windows.setdefault(api_key, deque())
+        now = time.monotonic()
+        tokens, last_ts = self._buckets.get(api_key, (self.rpm, now))
+        tokens = min(self.rpm, tokens + (now - last_ts) * self._refill_rate)
 
-        while window and window[0] < now - 60:
-            window.popleft()
-
-        if len(window) >= self.rpm:
-            retry_after = int(61 - (now - window[0]))
+        if tokens < 1:
+            self._buckets[api_key] = (tokens, now)
+            retry_after = math.ceil((1 - tokens) / self._refill_rate)
             logger.warning("Rate limit hit for key ending …%s", api_key[-4:])
             return Response(
                 content='{"detail":"Rate limit exceeded. Try again later."}',
@@ -59,7 +62,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 headers={"Retry-After": str(max(retry_after, 1))},
             )
 
-        window.append(now)
+        self._buckets[api_key] = (tokens - 1, now)
 
         self._request_count += 1
         if self._request_count % 100 == 0:
@@ -68,9 +71,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return await call_next(request)
 
     def _cleanup(self, now: float) -> None:
-        stale = [k for k, v in self._windows.items() if not v or v[-1] < now - 60]
+        # A bucket idle for a full minute has refilled; dropping it is lossless.
+        stale = [k for k, (_, ts) in self._buckets.items() if ts < now - 60]
         for k in stale:
-            del self._windows[k]
+            del self._buckets[k]
 
 
 # ---------------------------------------------------------------------------
@@ -87,25 +91,48 @@ _BLOCKED_NETWORKS = [
 ]
 
 
-def validate_url(url: str) -> str | None:
-    """Return an error string if the URL is unsafe, else None."""
-    parsed = urlparse(url)
-    if parsed.scheme not in ("http", "https"):
-        return f"Blocked: URL scheme '{parsed.scheme}' is not allowed. Use http or https."
+_DNS_CACHE_TTL = 300  # 5 minutes
+_DNS_CACHE_MAX = 1024
+
+# hostname -> (expires_at, block reason or None)
+_dns_cache: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
 
-    hostname = parsed.hostname
-    if not hostname:
-        return "Blocked: could not parse hostname from URL."
+
+async def _check_host(hostname: str) -> str | None:
+    now = time.monotonic()
+    entry = _dns_cache.get(hostname)
+    if entry is not None and entry[0] > now:
+        _dns_cache.move_to_end(hostname)
+        return entry[1]
 
     try:
-        addr_info = socket.getaddrinfo(hostname, None)
+        addr_info = await asyncio.get_running_loop().getaddrinfo(hostname, None)
     except socket.gaierror:
+        # Not cached: resolution failures are often transient.
         return f"Blocked: could not resolve hostname '{hostname}'."
 
+    error = None
     for family, _, _, _, sockaddr in addr_info:
         ip = ipaddress.ip_address(sockaddr[0])
-        for network in _BLOCKED_NETWORKS:
-            if ip in network:
-                return f"Blocked: URL resolves to a private/internal address ({ip})."
+        if any(ip in network for network in _BLOCKED_NETWORKS):
+            error = f"Blocked: URL resolves to a private/internal address ({ip})."
+            break
+
+    _dns_cache[hostname] = (now + _DNS_CACHE_TTL, error)
+    _dns_cache.move_to_end(hostname)
+    if len(_dns_cache) > _DNS_CACHE_MAX:
+        _dns_cache.popitem(last=False)
+    return error
+
+
+async def validate_url(url: str) -> str | None:
+    """Return an error string if the URL is unsafe, else None."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        return f"Blocked: URL scheme '{parsed.scheme}' is not allowed. Use http or https."
+
+    hostname = parsed.hostname
+    if not hostname:
+        return "Blocked: could not parse hostname from URL."
 
-    return None
+    return await _check_host(hostname)
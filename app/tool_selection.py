@@ -0,0 +1,119 @@
+import logging
+import math
+import re
+from collections import Counter
+from collections.abc import Callable
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from get in is it of on or the this to use with".split()
+)
+
+
+def _singular(token: str) -> str:
+    """Fold simple English plurals ("links", "entries") onto the singular."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _tokenize(text: str) -> list[str]:
+    return [_singular(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+# ---------------------------------------------------------------------------
+# TF-IDF index over tool name + description
+# ---------------------------------------------------------------------------
+
+
+class ToolIndex:
+    def __init__(self, tools: list[BaseTool]):
+        docs = {t.name: Counter(_tokenize(f"{t.name.replace('_', ' ')} {t.description}")) for t in tools}
+        df = Counter(term for terms in docs.values() for term in terms)
+        n = len(docs)
+        self._idf = {term: math.log((n + 1) / (count + 1)) + 1.0 for term, count in df.items()}
+        self._vectors = {name: self._weigh(terms) for name, terms in docs.items()}
+
+    def _weigh(self, terms: Counter) -> dict[str, float]:
+        vec = {t: c * self._idf[t] for t, c in terms.items() if t in self._idf}
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        return {t: w / norm for t, w in vec.items()} if norm else {}
+
+    def select(self, query: str, k: int) -> list[str] | None:
+        """Return the names of the top-k tools for `query`, or None if nothing matches."""
+        q = self._weigh(Counter(_tokenize(query)))
+        if not q:
+            return None
+        scores = {
+            name: sum(w * vec.get(t, 0.0) for t, w in q.items())
+            for name, vec in self._vectors.items()
+        }
+        ranked = sorted((s, name) for name, s in scores.items() if s > 0)
+        if not ranked:
+            return None
+        return [name for _, name in reversed(ranked[-k:])]
+
+
+# ---------------------------------------------------------------------------
+# Middleware: only send the relevant tool schemas to the model
+# ---------------------------------------------------------------------------
+
+
+class ToolSelectionMiddleware(AgentMiddleware):
+    """Trim the tool schemas sent to the model to the prompt's top-k matches.
+
+    All tools stay registered, so calls from earlier turns keep working; tools
+    already used in the conversation and those in `always_include` are always
+    kept. Selection only sees the first prompt, so fallbacks the model must be
+    able to reach later (e.g. the browser tools) belong in `always_include`.
+    `render_prompt`, if given, rebuilds the system prompt from the kept tool
+    names so it never tells the model to call a tool it was not sent.
+    """
+
+    def __init__(
+        self,
+        index: ToolIndex,
+        top_k: int,
+        always_include: tuple[str, ...] = (),
+        render_prompt: Callable[[frozenset[str]], str] | None = None,
+    ):
+        super().__init__()
+        self.index = index
+        self.top_k = top_k
+        self.always_include = frozenset(always_include)
+        self.render_prompt = render_prompt
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._filter(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._filter(request))
+
+    def _filter(self, request):
+        prompt = next(
+            (m.text for m in request.messages if isinstance(m, HumanMessage)),
+            "",
+        )
+        selected = self.index.select(prompt, self.top_k)
+        if selected is None:
+            return request
+
+        keep = set(selected) | self.always_include
+        for m in request.messages:
+            if isinstance(m, AIMessage):
+                keep.update(call["name"] for call in m.tool_calls)
+
+        tools = [t for t in request.tools if not isinstance(t, BaseTool) or t.name in keep]
+        names = frozenset(t.name for t in tools if isinstance(t, BaseTool))
+        logger.debug("Tool selection: %s", ", ".join(sorted(names)))
+        if self.render_prompt is None:
+            return request.override(tools=tools)
+        return request.override(tools=tools, system_message=SystemMessage(content=self.render_prompt(names)))
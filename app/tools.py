@@ -1,12 +1,25 @@
-import json
+import asyncio
+import functools
+import io
+import itertools
 import logging
 import random
 import time
-from urllib.parse import urljoin, urlparse
+import weakref
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
+from typing import NamedTuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
 
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+import orjson
+from cssselect import SelectorError
 from langchain_core.tools import tool
+from lxml import etree
+from lxml.cssselect import CSSSelector
 
 from app.security import validate_url
 
@@ -30,46 +43,153 @@ _BASE_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# Explicit pool + HTTP/2 so repeat hits on one host (crawl, page_info then
+# scrape) reuse a warm connection. Closed in the app lifespan.
 http_client = httpx.AsyncClient(
+    http2=True,
     follow_redirects=True,
-    timeout=30.0,
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
     headers=_BASE_HEADERS,
 )
 
 _MAX_CHARS = 10_000
 _MAX_ELEMENTS = 50
-_CACHE_TTL = 300  # 5 minutes
+_CACHE_TTL = 300  # 5 minutes, when the server sends no freshness info
+_MAX_CONCURRENT_FETCHES = 10
+_MAX_CONCURRENT_PER_HOST = 4
+_MAX_BODY_BYTES = 1_000_000  # Stop reading bodies past this; output is truncated far below it
 
+# Caps in-flight requests (crawl levels, batch) below the keep-alive pool size.
+_fetch_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+# Keeps a crawl polite to one site; entries vanish once no fetch holds them.
+_host_semaphores: weakref.WeakValueDictionary[str, asyncio.Semaphore] = weakref.WeakValueDictionary()
 
-def _random_headers() -> dict[str, str]:
-    return {"User-Agent": random.choice(_USER_AGENTS)}
 
+def _host_semaphore(host: str) -> asyncio.Semaphore:
+    sem = _host_semaphores.get(host)
+    if sem is None:
+        sem = _host_semaphores[host] = asyncio.Semaphore(_MAX_CONCURRENT_PER_HOST)
+    return sem
 
-# ---------------------------------------------------------------------------
-# In-memory URL response cache
-# ---------------------------------------------------------------------------
 
-_cache: dict[str, tuple[str, float]] = {}
+# Per-request headers, built once and rotated in an order shuffled at import.
+# Read-only views, since every request shares them.
+_HEADERS_CYCLE = itertools.cycle(
+    [MappingProxyType({"User-Agent": ua}) for ua in random.sample(_USER_AGENTS, len(_USER_AGENTS))]
+)
 
 
-def _cache_get(url: str) -> str | None:
-    entry = _cache.get(url)
-    if entry is None:
-        return None
-    html, ts = entry
-    if time.monotonic() - ts > _CACHE_TTL:
-        del _cache[url]
-        return None
-    return html
+def _next_headers() -> Mapping[str, str]:
+    """The next shared, read-only header set in the rotation. Copy it to add headers."""
+    return next(_HEADERS_CYCLE)
 
 
-def _cache_set(url: str, html: str) -> None:
-    _cache[url] = (html, time.monotonic())
+# ---------------------------------------------------------------------------
+# In-memory URL response cache
+# ---------------------------------------------------------------------------
+
+_CACHE_TTL_BOUNDS = (60, 3600)  # Clamp server-provided freshness lifetimes
+# The page cache is bounded by estimated memory, not entry count: a parsed lxml
+# tree costs roughly 16x its HTML, so trees dominate and are weighed as such.
+_CACHE_MAX_WEIGHT = 128_000_000
+_TREE_WEIGHT_FACTOR = 16
+_ERROR_CACHE_MAX = 512
+
+
+class _CacheEntry(NamedTuple):
+    html: str
+    tree: lxml.html.HtmlElement | None  # Parsed on first use
+    etag: str | None
+    last_modified: str | None
+    expires_at: float  # time.monotonic() deadline
+
+
+# url -> entry, least recently used first
+_cache: OrderedDict[str, _CacheEntry] = OrderedDict()
+_cache_weight = 0  # Sum of _entry_weight over _cache
+
+
+def _entry_weight(entry: _CacheEntry) -> int:
+    return len(entry.html) * (1 + _TREE_WEIGHT_FACTOR if entry.tree is not None else 1)
+
+
+def _cache_put(url: str, entry: _CacheEntry) -> None:
+    """Insert or replace an entry as most recently used, evicting LRU entries over budget."""
+    global _cache_weight
+    previous = _cache.get(url)
+    if previous is not None:
+        _cache_weight -= _entry_weight(previous)
+    _cache[url] = entry
+    _cache.move_to_end(url)
+    _cache_weight += _entry_weight(entry)
+    while _cache_weight > _CACHE_MAX_WEIGHT and len(_cache) > 1:
+        _, evicted = _cache.popitem(last=False)
+        _cache_weight -= _entry_weight(evicted)
+
+
+def _cache_ttl(headers: httpx.Headers) -> float:
+    """Freshness lifetime from Cache-Control max-age or Expires, else the default TTL."""
+    ttl: float = _CACHE_TTL
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() == "max-age" and value.isdigit():
+            ttl = int(value)
+            break
+    else:
+        if "expires" in headers:
+            try:
+                ttl = parsedate_to_datetime(headers["expires"]).timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass
+    low, high = _CACHE_TTL_BOUNDS
+    return min(max(ttl, low), high)
+
+
+def _cache_discard(url: str) -> None:
+    global _cache_weight
+    entry = _cache.pop(url, None)
+    if entry is not None:
+        _cache_weight -= _entry_weight(entry)
+
+
+def _cache_set(url: str, html: str, headers: httpx.Headers) -> None:
+    _cache_put(
+        url,
+        _CacheEntry(
+            html,
+            None,
+            headers.get("etag"),
+            headers.get("last-modified"),
+            time.monotonic() + _cache_ttl(headers),
+        ),
+    )
+
+
+_ERROR_CACHE_TTL = 60
+_ERROR_CACHE_MAX_TTL = 600
+
+# url -> (retry_after, consecutive failures, error message) for 4xx/5xx responses.
+# Kept past expiry so a URL that keeps failing backs off: 60s, 120s, ... up to 10 min.
+_error_cache: OrderedDict[str, tuple[float, int, str]] = OrderedDict()
+
+
+def _error_cache_set(url: str, error: str) -> None:
+    previous = _error_cache.get(url)
+    failures = previous[1] + 1 if previous is not None else 1
+    ttl = min(_ERROR_CACHE_MAX_TTL, _ERROR_CACHE_TTL * 2 ** (failures - 1))
+    _error_cache[url] = (time.monotonic() + ttl, failures, error)
+    _error_cache.move_to_end(url)
+    if len(_error_cache) > _ERROR_CACHE_MAX:
+        _error_cache.popitem(last=False)
 
 
 def cache_clear() -> None:
     """Clear the URL response cache."""
+    global _cache_weight
     _cache.clear()
+    _cache_weight = 0
+    _error_cache.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -77,31 +197,148 @@ def cache_clear() -> None:
 # ---------------------------------------------------------------------------
 
 
+def _decode(body: bytes, encoding: str | None) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:  # Unknown charset in Content-Type
+        return body.decode("utf-8", errors="replace")
+
+
+async def _read_body(resp: httpx.Response) -> tuple[bytes, bool]:
+    """Read up to _MAX_BODY_BYTES of the body; returns (body, truncated)."""
+    body = bytearray()
+    async for chunk in resp.aiter_bytes():
+        body += chunk
+        if len(body) > _MAX_BODY_BYTES:
+            return bytes(body[:_MAX_BODY_BYTES]), True
+    return bytes(body), False
+
+
 async def _fetch(url: str) -> tuple[str | None, str | None]:
     """Fetch a URL and return (html, error). Validates SSRF first."""
-    ssrf_error = validate_url(url)
+    ssrf_error = await validate_url(url)
     if ssrf_error:
         return None, ssrf_error
 
-    cached = _cache_get(url)
-    if cached is not None:
-        return cached, None
+    entry = _cache.get(url)
+    if entry is not None and time.monotonic() < entry.expires_at:
+        _cache.move_to_end(url)
+        return entry.html, None
+
+    failed = _error_cache.get(url)
+    if failed is not None and time.monotonic() < failed[0]:
+        return None, failed[2]
+
+    headers = _next_headers()
+    if entry is not None:
+        # Stale: revalidate, and renew the entry if the server answers 304
+        headers = dict(headers)
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
 
     try:
-        resp = await http_client.get(url, headers=_random_headers())
-        resp.raise_for_status()
-        html = resp.text
-        _cache_set(url, html)
+        async with (
+            _host_semaphore(urlsplit(url).netloc),
+            _fetch_semaphore,
+            http_client.stream("GET", url, headers=headers) as resp,
+        ):
+            if resp.status_code == 304 and entry is not None:
+                _cache_put(url, entry._replace(expires_at=time.monotonic() + _cache_ttl(resp.headers)))
+                return entry.html, None
+            resp.raise_for_status()
+            body, truncated = await _read_body(resp)
+        html = _decode(body, resp.charset_encoding)
+        if truncated:
+            # A cut-off page must not be served (or revalidated) as the full one.
+            _cache_discard(url)
+        else:
+            _cache_set(url, html, resp.headers)
+        _error_cache.pop(url, None)
         return html, None
     except httpx.HTTPStatusError as exc:
-        return None, f"HTTP error {exc.response.status_code} fetching {url}: {exc.response.reason_phrase}"
+        error = f"HTTP error {exc.response.status_code} fetching {url}: {exc.response.reason_phrase}"
+        if exc.response.status_code >= 400:
+            _error_cache_set(url, error)
+        return None, error
     except httpx.RequestError as exc:
         return None, f"Request error fetching {url}: {exc}"
 
 
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+# Text inside these never renders; skipped below the selected element.
+_RAW_TEXT_TAGS = frozenset({"script", "style", "template"})
+_TEXT_XPATH = etree.XPath(
+    ".//text()[not(parent::script or parent::style or parent::template)]",
+    smart_strings=False,
+)
+_OG_META_XPATH = etree.XPath('//meta[starts-with(@property, "og:")]')
+_JSON_LD_XPATH = etree.XPath('//script[@type="application/ld+json"]')
+_HREF_XPATH = etree.XPath("//a/@href", smart_strings=False)
+_DESCRIPTION_XPATH = etree.XPath('//meta[@name="description"]/@content', smart_strings=False)
+_CANONICAL_XPATH = etree.XPath(
+    '//link[contains(concat(" ", normalize-space(@rel), " "), " canonical ")]/@href',
+    smart_strings=False,
+)
+
+
+def _parse(html: str) -> lxml.html.HtmlElement:
+    # Parse bytes: lxml rejects str input that carries an XML encoding declaration.
+    return lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=_HTML_PARSER)
+
+
+async def _fetch_tree(url: str) -> tuple[lxml.html.HtmlElement | None, str | None]:
+    """Fetch a URL and return (parsed tree, error). The tree is cached with the HTML."""
+    html, error = await _fetch(url)
+    if error:
+        return None, error
+
+    entry = _cache.get(url)
+    if entry is not None and entry.html is html and entry.tree is not None:
+        return entry.tree, None
+
+    try:
+        tree = _parse(html)
+    except (etree.ParserError, ValueError):
+        return None, f"Could not parse HTML from {url}."
+    if entry is not None and entry.html is html:
+        _cache_put(url, entry._replace(tree=tree))
+    return tree, None
+
+
+def _text(el: lxml.html.HtmlElement) -> str:
+    """Visible text of an element, whitespace-stripped pieces joined by spaces.
+
+    A selected <script>/<style>/<template> returns its own content, e.g. the
+    JSON in script#__NEXT_DATA__.
+    """
+    if el.tag in _RAW_TEXT_TAGS:
+        return (el.text or "").strip()
+    return " ".join(s for s in (t.strip() for t in _TEXT_XPATH(el)) if s)
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled(selector: str) -> CSSSelector:
+    """Compile a CSS selector to XPath once; agents reuse a handful of selectors."""
+    return CSSSelector(selector, translator="html")
+
+
+def _select(tree: lxml.html.HtmlElement, selector: str) -> list[lxml.html.HtmlElement] | str:
+    """Run a CSS selector, returning matches or an error string."""
+    try:
+        return _compiled(selector)(tree)
+    except SelectorError as exc:
+        return f"Invalid CSS selector '{selector}': {exc}"
+
+
+_TRUNCATED_MARKER = "\n\n[Truncated — showing first {limit} characters]"
+
+
 def _truncate(text: str, limit: int = _MAX_CHARS) -> str:
     if len(text) > limit:
-        return text[:limit] + f"\n\n[Truncated — showing first {limit} characters]"
+        return text[:limit] + _TRUNCATED_MARKER.format(limit=limit)
     return text
 
 
@@ -119,24 +356,24 @@ async def scrape(url: str, selector: str = "body", extract: str = "text") -> str
         selector: CSS selector to target elements (default: "body").
         extract: What to extract — "text", "html", or "attrs".
     """
-    html, error = await _fetch(url)
+    tree, error = await _fetch_tree(url)
     if error:
         return error
 
-    soup = BeautifulSoup(html, "lxml")
-    elements = soup.select(selector, limit=_MAX_ELEMENTS)
-
+    elements = _select(tree, selector)
+    if isinstance(elements, str):
+        return elements
     if not elements:
         return f"No elements found matching selector '{selector}'."
 
     results: list[str] = []
-    for el in elements:
+    for el in elements[:_MAX_ELEMENTS]:
         if extract == "html":
-            results.append(str(el))
+            results.append(lxml.html.tostring(el, encoding="unicode", with_tail=False))
         elif extract == "attrs":
-            results.append(json.dumps(dict(el.attrs)))
+            results.append(orjson.dumps(dict(el.attrib)).decode())
         else:
-            results.append(el.get_text(separator=" ", strip=True))
+            results.append(_text(el))
 
     output = "\n---\n".join(results)
     return _truncate(output)
@@ -150,30 +387,24 @@ async def scrape_table(url: str, table_index: int = 0) -> str:
         url: The URL to fetch.
         table_index: 0-based index of the table to extract.
     """
-    html, error = await _fetch(url)
+    tree, error = await _fetch_tree(url)
     if error:
         return error
 
-    soup = BeautifulSoup(html, "lxml")
-    tables = soup.find_all("table")
-
-    if not tables:
-        return "No tables found on the page."
-    if table_index < 0 or table_index >= len(tables):
-        return f"table_index {table_index} is out of range. Found {len(tables)} table(s) (indices 0–{len(tables) - 1})."
+    # Stop walking the document at the requested table; count them all only on error
+    table = next(itertools.islice(tree.iter("table"), table_index, None), None) if table_index >= 0 else None
+    if table is None:
+        n_tables = sum(1 for _ in tree.iter("table"))
+        if not n_tables:
+            return "No tables found on the page."
+        return f"table_index {table_index} is out of range. Found {n_tables} table(s) (indices 0–{n_tables - 1})."
 
-    table = tables[table_index]
-    rows = table.find_all("tr")
+    rows = [[_text(c) for c in tr.iterchildren("th", "td")] for tr in table.iter("tr")]
     if not rows:
         return "Table has no rows."
 
-    md_rows: list[str] = []
-    for i, row in enumerate(rows):
-        cells = row.find_all(["th", "td"])
-        values = [c.get_text(separator=" ", strip=True) for c in cells]
-        md_rows.append("| " + " | ".join(values) + " |")
-        if i == 0:
-            md_rows.append("| " + " | ".join("---" for _ in values) + " |")
+    md_rows = ["| " + " | ".join(cells) + " |" for cells in rows]
+    md_rows.insert(1, "| " + " | ".join(["---"] * len(rows[0])) + " |")
 
     output = "\n".join(md_rows)
     return _truncate(output)
@@ -185,34 +416,29 @@ async def page_info(url: str) -> str:
 
     Returns title, description, OG tags, canonical URL, and link/image/table counts.
     """
-    html, error = await _fetch(url)
+    tree, error = await _fetch_tree(url)
     if error:
         return error
 
-    soup = BeautifulSoup(html, "lxml")
+    title_tag = tree.find(".//title")
+    meta_desc = _DESCRIPTION_XPATH(tree)
+    canonical = _CANONICAL_XPATH(tree)
 
-    title_tag = soup.find("title")
-    meta_desc = soup.find("meta", attrs={"name": "description"})
-    canonical = soup.find("link", attrs={"rel": "canonical"})
-
-    og_tags: dict[str, str] = {}
-    for tag in soup.find_all("meta", attrs={"property": True}):
-        prop = tag.get("property", "")
-        if prop.startswith("og:"):
-            og_tags[prop] = tag.get("content", "")
+    og_tags = {tag.get("property"): tag.get("content", "") for tag in _OG_META_XPATH(tree)}
+    counts = Counter(el.tag for el in tree.iter("a", "img", "table"))
 
     metadata = {
-        "title": title_tag.get_text(strip=True) if title_tag else None,
-        "description": meta_desc.get("content") if meta_desc else None,
-        "canonical_url": canonical.get("href") if canonical else None,
+        "title": _text(title_tag) if title_tag is not None else None,
+        "description": meta_desc[0] if meta_desc else None,
+        "canonical_url": canonical[0] if canonical else None,
         "og": og_tags or None,
         "counts": {
-            "links": len(soup.find_all("a")),
-            "images": len(soup.find_all("img")),
-            "tables": len(soup.find_all("table")),
+            "links": counts["a"],
+            "images": counts["img"],
+            "tables": counts["table"],
         },
     }
-    return json.dumps(metadata, indent=2)
+    return orjson.dumps(metadata, option=orjson.OPT_INDENT_2).decode()
 
 
 # ---------------------------------------------------------------------------
@@ -220,26 +446,40 @@ async def page_info(url: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def _filter_structured(data, fields: set[str]):
-    """Recursively filter nested dicts/lists to only keep matching field names."""
+def _filter_structured(data, fields: frozenset[str]):
+    """Recursively filter nested dicts/lists to only keep matching field names.
+
+    Containers the filter leaves untouched are returned as-is rather than copied.
+    """
     if isinstance(data, dict):
         filtered = {}
+        unchanged = True
         for k, v in data.items():
-            key_lower = k.lower().lstrip("@")
-            if key_lower in fields:
+            if k.lower().lstrip("@") in fields:
                 filtered[k] = v
+                continue
+            child = _filter_structured(v, fields)
+            if child is not None:
+                filtered[k] = child
+                unchanged = unchanged and child is v
             else:
-                child = _filter_structured(v, fields)
-                if child is not None:
-                    filtered[k] = child
-        return filtered if filtered else None
+                unchanged = False
+        if not filtered:
+            return None
+        return data if unchanged else filtered
     if isinstance(data, list):
         results = []
+        unchanged = True
         for item in data:
             child = _filter_structured(item, fields)
             if child is not None:
                 results.append(child)
-        return results if results else None
+                unchanged = unchanged and child is item
+            else:
+                unchanged = False
+        if not results:
+            return None
+        return data if unchanged else results
     return None
 
 
@@ -254,66 +494,61 @@ async def scrape_json(url: str, fields: str = "") -> str:
         url: The URL to fetch.
         fields: Optional comma-separated field names to filter (e.g. "name,price,image").
     """
-    html, error = await _fetch(url)
+    tree, error = await _fetch_tree(url)
     if error:
         return error
 
-    soup = BeautifulSoup(html, "lxml")
     result: dict = {}
 
     # JSON-LD
-    json_ld_scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
+    json_ld_scripts = _JSON_LD_XPATH(tree)
     json_ld_items: list = []
     for script in json_ld_scripts:
         try:
-            data = json.loads(script.string or "")
+            data = orjson.loads(script.text or "")
             if isinstance(data, dict) and "@graph" in data:
                 json_ld_items.extend(data["@graph"])
             elif isinstance(data, list):
                 json_ld_items.extend(data)
             else:
                 json_ld_items.append(data)
-        except (json.JSONDecodeError, TypeError):
+        except (orjson.JSONDecodeError, TypeError):
             continue
     if json_ld_items:
         result["json_ld"] = json_ld_items
 
     # OpenGraph meta tags
-    og_tags: dict[str, str] = {}
-    for tag in soup.find_all("meta", attrs={"property": True}):
-        prop = tag.get("property", "")
-        if prop.startswith("og:"):
-            og_tags[prop.removeprefix("og:")] = tag.get("content", "")
+    og_tags = {tag.get("property")[3:]: tag.get("content", "") for tag in _OG_META_XPATH(tree)}
     if og_tags:
         result["opengraph"] = og_tags
 
     # Standard meta tags
     meta_tags: dict[str, str] = {}
     for name in ("description", "author", "keywords"):
-        tag = soup.find("meta", attrs={"name": name})
-        if tag and tag.get("content"):
-            meta_tags[name] = tag["content"]
+        tag = tree.xpath(f'//meta[@name="{name}"]')
+        if tag and tag[0].get("content"):
+            meta_tags[name] = tag[0].get("content")
     if meta_tags:
         result["meta"] = meta_tags
 
     # Title
-    title_tag = soup.find("title")
-    if title_tag:
-        result["title"] = title_tag.get_text(strip=True)
+    title_tag = tree.find(".//title")
+    if title_tag is not None:
+        result["title"] = _text(title_tag)
 
     if not result:
         return "No structured data found on this page."
 
     # Optional field filtering
     if fields.strip():
-        field_set = {f.strip().lower() for f in fields.split(",") if f.strip()}
+        field_set = frozenset(f.strip().lower() for f in fields.split(",") if f.strip())
         filtered = _filter_structured(result, field_set)
         if filtered:
             result = filtered
         else:
             return f"No fields matching '{fields}' found in the structured data."
 
-    output = json.dumps(result, indent=2, ensure_ascii=False)
+    output = orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
     return _truncate(output)
 
 
@@ -321,6 +556,43 @@ async def scrape_json(url: str, fields: str = "") -> str:
 # Multi-page crawl
 # ---------------------------------------------------------------------------
 
+# Links that never lead to another same-domain page; skipped before urljoin
+_SKIP_HREF_PREFIXES = ("#", "javascript:", "mailto:", "tel:")
+_CRAWL_MAX_CHARS = 20_000
+
+
+class _BoundedWriter:
+    """Join sections up to `limit` characters, the same output as _truncate(sep.join(...), limit).
+
+    Writing past the limit keeps only what fits, so the full text is never built.
+    """
+
+    def __init__(self, limit: int, sep: str):
+        self._buf = io.StringIO()
+        self._limit = limit
+        self._remaining = limit
+        self._sep = sep
+        self._empty = True  # No section written yet (a written one may be "")
+        self.full = False
+
+    def write(self, section: str) -> None:
+        if self.full:
+            return
+        if self._empty:
+            self._empty = False
+        else:
+            section = self._sep + section
+        if len(section) > self._remaining:
+            self._buf.write(section[: self._remaining])
+            self._buf.write(_TRUNCATED_MARKER.format(limit=self._limit))
+            self.full = True
+        else:
+            self._buf.write(section)
+        self._remaining -= len(section)
+
+    def getvalue(self) -> str:
+        return self._buf.getvalue()
+
 
 @tool
 async def crawl(url: str, max_pages: int = 5, selector: str = "body") -> str:
@@ -334,51 +606,56 @@ async def crawl(url: str, max_pages: int = 5, selector: str = "body") -> str:
         selector: CSS selector to extract content from each page (default: "body").
     """
     max_pages = max(1, min(10, max_pages))
-    parsed_start = urlparse(url)
-    domain = parsed_start.netloc
-
-    visited: set[str] = set()
-    queue: list[str] = [url]
-    results: list[str] = []
-
-    while queue and len(visited) < max_pages:
-        current_url = queue.pop(0)
-
-        # Normalize for dedup (strip query string)
-        normalized = urlparse(current_url)._replace(query="", fragment="").geturl()
-        if normalized in visited:
-            continue
-        visited.add(normalized)
-
-        html, error = await _fetch(current_url)
-        if error:
-            results.append(f"[{current_url}]\nError: {error}")
-            continue
-
-        soup = BeautifulSoup(html, "lxml")
+    scheme, domain, path, _, _ = urlsplit(url)
+
+    # Normalized (query/fragment stripped) URLs already queued or visited, so
+    # the frontier never holds duplicates.
+    seen: set[str] = {urlunsplit((scheme, domain, path, "", ""))}
+    queue: deque[str] = deque([url])
+    visited = 0
+    results = _BoundedWriter(_CRAWL_MAX_CHARS, sep="\n\n---\n\n")
+
+    while queue and visited < max_pages and not results.full:
+        # Take the rest of the current frontier (up to the page budget) as one level
+        level = [queue.popleft() for _ in range(min(len(queue), max_pages - visited))]
+        visited += len(level)
+
+        fetched = await asyncio.gather(*(_fetch_tree(u) for u in level), return_exceptions=True)
+
+        for current_url, outcome in zip(level, fetched):
+            if results.full:
+                break
+            if isinstance(outcome, BaseException):
+                results.write(f"[{current_url}]\nError: {outcome}")
+                continue
+            tree, error = outcome
+            if error:
+                results.write(f"[{current_url}]\nError: {error}")
+                continue
 
-        # Extract content with selector
-        elements = soup.select(selector, limit=_MAX_ELEMENTS)
-        if elements:
-            text = "\n".join(el.get_text(separator=" ", strip=True) for el in elements)
-            results.append(f"[{current_url}]\n{text}")
-        else:
-            results.append(f"[{current_url}]\nNo elements matching '{selector}'.")
+            # Extract content with selector
+            elements = _select(tree, selector)
+            if isinstance(elements, str):
+                return elements
+            if elements:
+                text = "\n".join(_text(el) for el in elements[:_MAX_ELEMENTS])
+                results.write(f"[{current_url}]\n{text}")
+            else:
+                results.write(f"[{current_url}]\nNo elements matching '{selector}'.")
 
-        # Discover same-domain links
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            abs_url = urljoin(current_url, href)
-            parsed = urlparse(abs_url)
+            # Discover same-domain links
+            for href in _HREF_XPATH(tree):
+                if href.startswith(_SKIP_HREF_PREFIXES):
+                    continue
+                abs_url = urljoin(current_url, href)
+                link_scheme, netloc, link_path, _, _ = urlsplit(abs_url)
 
-            if parsed.scheme not in ("http", "https"):
-                continue
-            if parsed.netloc != domain:
-                continue
+                if netloc != domain or link_scheme not in ("http", "https"):
+                    continue
 
-            norm = parsed._replace(query="", fragment="").geturl()
-            if norm not in visited:
-                queue.append(abs_url)
+                norm = urlunsplit((link_scheme, netloc, link_path, "", ""))
+                if norm not in seen:
+                    seen.add(norm)
+                    queue.append(abs_url)
 
-    output = "\n\n---\n\n".join(results)
-    return _truncate(output, limit=20_000)
+    return results.getvalue()